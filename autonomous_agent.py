@@ -1,10 +1,8 @@
 import time
 import random
-import sys
 import math
 import asyncio
-from datetime import datetime
-from core import RouteFinder, WeatherService, ElevationService, TrafficService, CostModel, TrafficCondition, WeatherData, RouteMetrics
+from core import RouteFinder, WeatherService, ElevationService, TrafficService, CostModel, TrafficCondition, close_http_client
 
 # Configuration
 ORIGIN = (40.7128, -74.0060) # NYC
@@ -15,6 +13,15 @@ DESTINATION = (42.3601, -71.0589) # Boston (Long trip)
 SIMULATION_SPEED_MULTIPLIER = 500 # Speed up simulation
 UPDATE_INTERVAL_REAL = 3 
 
+# Simulated event model (hoisted so the tick loop doesn't rebuild these)
+EVENT_PROBABILITY = 0.05 # Per tick, for each event type
+_TRAFFIC_CHOICES = tuple(TrafficCondition)
+_PRECIPITATION_CHOICES = (0, 5, 20)
+_WIND_CHOICES = (5, 15, 40)
+
+# Single-line progress display, redrawn in place each tick
+STATUS_TEMPLATE = "\rTravel: %.1f%% | Current Cost: %.2f | %s"
+
 def print_box(title, content):
     print(f"\n{'='*70}")
     print(f"| {title.center(66)} |")
@@ -26,6 +33,10 @@ def print_box(title, content):
         print(f"| {content.ljust(66)} |")
     print(f"{ '='*70}\n")
 
+def generate_event_stream(n_ticks, rng=random):
+    """Pre-draw which ticks see a weather and/or traffic event: list of (weather, traffic) flags."""
+    return [(rng.random() < EVENT_PROBABILITY, rng.random() < EVENT_PROBABILITY) for _ in range(n_ticks)]
+
 def generate_explanation(selected_route, alternatives):
     """Generate human-readable explanation for the choice."""
     if not alternatives:
@@ -62,11 +73,11 @@ async def autonomous_loop():
     # 1. Route Generation
     print(">> [Step 1] Fetching candidate routes...")
     try:
-        routes_data = await RouteFinder.get_routes(ORIGIN[0], ORIGIN[1], DESTINATION[0], DESTINATION[1])
+        routes_data = await RouteFinder.get_routes(ORIGIN[0], ORIGIN[1], DESTINATION[0], DESTINATION[1], overview="simplified")
     except Exception as e:
         print(f"CRITICAL ERROR: Route fetching failed. Retrying... {e}")
         time.sleep(2)
-        routes_data = await RouteFinder.get_routes(ORIGIN[0], ORIGIN[1], DESTINATION[0], DESTINATION[1]) # Retry once
+        routes_data = await RouteFinder.get_routes(ORIGIN[0], ORIGIN[1], DESTINATION[0], DESTINATION[1], overview="simplified") # Retry once
 
     if not routes_data:
         print("FATAL: No routes found. Aborting.")
@@ -83,37 +94,47 @@ async def autonomous_loop():
     print(f"   Weather: {current_weather.condition}, {current_weather.temperature}°C (Source: {'Fallback' if current_weather.is_fallback else 'Live API'})")
 
     print(">> [Step 3] Enriching routes with elevation and traffic data...")
-    for i, r_data in enumerate(routes_data):
-        # Extract geometry
-        geometry = r_data.get("geometry", {}).get("coordinates", [])
-        
+    geometries = [r_data.get("geometry", {}).get("coordinates", []) for r_data in routes_data]
+    
+    # Elevation Stats (samples of all routes fetched in one batched lookup)
+    elevation_stats = await ElevationService.get_routes_elevation_stats(geometries)
+    
+    for i, (r_data, geometry, (ascent, descent)) in enumerate(zip(routes_data, geometries, elevation_stats)):
         # Distance & Duration from provider
         distance = r_data.get("distance", 0) / 1000.0
         duration = r_data.get("duration", 0) / 60.0
         
-        # Elevation Stats
-        ascent, descent = await ElevationService.get_route_elevation_stats(geometry)
-        
         # Traffic
         # Use midpoint for traffic check location approx
         mid_point = geometry[len(geometry)//2] if geometry else [ORIGIN[1], ORIGIN[0]]
         traffic = TrafficService.get_traffic(mid_point[1], mid_point[0], r_data.get("duration", 0), distance)
         
-        # Compute Cost
-        metrics = CostModel.calculate(distance, duration, ascent, traffic, current_weather)
-        
+        # Route-invariant cost terms are kept for re-scoring during the trip
         candidate_routes.append({
             "id": i,
             "data": r_data,
-            "metrics": metrics,
             "traffic": traffic,
-            "ascent": ascent
+            "ascent": ascent,
+            "base": CostModel.base_costs(distance, duration, ascent)
         })
-        print(f"   Route {i}: {distance:.1f}km | Ascent: {ascent:.0f}m | Traffic: {traffic.value} | Score: {metrics.total_cost_score:.2f}")
 
-    # Select Best
-    candidate_routes.sort(key=lambda x: x["metrics"].total_cost_score)
-    active_route = candidate_routes[0]
+    # Compute Cost for all candidates in one pass under the shared weather
+    all_metrics = CostModel.calculate_batch(
+        [c["base"] for c in candidate_routes],
+        [c["traffic"] for c in candidate_routes],
+        current_weather
+    )
+    for candidate, metrics in zip(candidate_routes, all_metrics):
+        candidate["metrics"] = metrics
+        print(f"   Route {candidate['id']}: {candidate['base']['distance_km']:.1f}km | Ascent: {candidate['ascent']:.0f}m | Traffic: {candidate['traffic'].value} | Score: {metrics.total_cost_score:.2f}")
+
+    # Re-routing scans alternatives cheapest-possible first so it can stop early
+    for candidate in candidate_routes:
+        candidate["min_cost"] = CostModel.min_possible_cost(candidate["base"])
+    reroute_order = sorted(candidate_routes, key=lambda x: x["min_cost"])
+
+    # Select Best (only the top route is needed, so no full sort)
+    active_route = min(candidate_routes, key=lambda x: x["metrics"].total_cost_score)
     
     explanation = generate_explanation(active_route, candidate_routes)
     print_box("ROUTE SELECTED", explanation)
@@ -123,37 +144,39 @@ async def autonomous_loop():
     
     progress_pct = 0.0
     hysteresis = 1.0 # Cost difference needed to switch
+    step = 5 * (SIMULATION_SPEED_MULTIPLIER / 1000) # Progress increment
+    events = generate_event_stream(math.ceil(100 / step) + 1) # +1 absorbs float drift in progress_pct
+    tick = 0
     
     while progress_pct < 100:
         # Simulate travel
-        step = 5 * (SIMULATION_SPEED_MULTIPLIER / 1000) # Progress increment
         progress_pct += step
         if progress_pct > 100: progress_pct = 100
         
         # Dynamic Events (Simulated)
         event_msg = None
+        weather_event, traffic_event = events[tick]
+        tick += 1
         
         # 1. Weather Change?
-        if random.random() < 0.05: # 5% chance
-            current_weather.precipitation = random.choice([0, 5, 20])
-            current_weather.wind_speed = random.choice([5, 15, 40])
+        if weather_event:
+            current_weather.precipitation = random.choice(_PRECIPITATION_CHOICES)
+            current_weather.wind_speed = random.choice(_WIND_CHOICES)
             event_msg = f"WEATHER CHANGE: Rain {current_weather.precipitation}mm, Wind {current_weather.wind_speed}km/h"
         
         # 2. Traffic Change?
-        if random.random() < 0.05:
+        if traffic_event:
              old_traffic = active_route['traffic']
-             active_route['traffic'] = random.choice(list(TrafficCondition))
+             active_route['traffic'] = random.choice(_TRAFFIC_CHOICES)
              if old_traffic != active_route['traffic']:
                  event_msg = f"TRAFFIC UPDATE: Route {active_route['id']} is now {active_route['traffic'].value}"
 
-        status_line = f"Travel: {progress_pct:.1f}% | Current Cost: {active_route['metrics'].total_cost_score:.2f} | {current_weather.condition}"
+        status_line = STATUS_TEMPLATE % (progress_pct, active_route['metrics'].total_cost_score, current_weather.condition)
         if event_msg:
             print(f"\n!! {event_msg}")
             # Recalculate Active Route Cost
-            new_metrics = CostModel.calculate(
-                active_route['metrics'].distance_km, 
-                active_route['metrics'].estimated_time_min,
-                active_route['ascent'],
+            new_metrics = CostModel.recalculate_with_env(
+                active_route['base'],
                 active_route['traffic'],
                 current_weather
             )
@@ -163,16 +186,16 @@ async def autonomous_loop():
             best_alt = None
             current_best_score = active_route['metrics'].total_cost_score
             
-            for alt in candidate_routes:
+            for alt in reroute_order:
+                # No remaining route can undercut the threshold even with zero penalties
+                if alt['min_cost'] >= current_best_score - hysteresis: break
                 if alt['id'] == active_route['id']: continue
                 
                 # Assume other routes might have different random traffic for this simulation
                 # In real world, we'd query traffic for them too.
                 # Let's just update their weather impact
-                alt_metrics = CostModel.calculate(
-                    alt['metrics'].distance_km,
-                    alt['metrics'].estimated_time_min,
-                    alt['ascent'],
+                alt_metrics = CostModel.recalculate_with_env(
+                    alt['base'],
                     alt['traffic'], 
                     current_weather
                 )
@@ -190,8 +213,7 @@ async def autonomous_loop():
                 ])
                 active_route = best_alt
         
-        sys.stdout.write(f"\r{status_line}")
-        sys.stdout.flush()
+        print(status_line, end="", flush=True)
         time.sleep(UPDATE_INTERVAL_REAL)
 
     print_box("DESTINATION REACHED", [
@@ -201,5 +223,11 @@ async def autonomous_loop():
         "System Status: Standby"
     ])
 
+async def main():
+    try:
+        await autonomous_loop()
+    finally:
+        await close_http_client()
+
 if __name__ == "__main__":
-    asyncio.run(autonomous_loop())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
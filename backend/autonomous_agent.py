@@ -1,9 +1,7 @@
 import time
 import random
 import sys
-import math
-from datetime import datetime
-from core import RouteFinder, WeatherService, ElevationService, TrafficService, CostModel, TrafficCondition, WeatherData, RouteMetrics
+from core import RouteFinder, WeatherService, ElevationService, TrafficService, CostModel, TrafficCondition
 
 # Configuration
 ORIGIN = (40.7128, -74.0060) # NYC
@@ -1,8 +1,8 @@
 import requests
+from requests.adapters import HTTPAdapter
 import math
-import random
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Tuple
 from enum import Enum
 from pydantic import BaseModel
 
@@ -39,6 +39,11 @@ class RouteExplanation(BaseModel):
     factors: List[str]
     confidence: str
 
+# Shared HTTP session: keep-alive connections to Open-Meteo, Open-Elevation and OSRM
+# are reused across calls instead of a new TCP/TLS handshake per request
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50))
+
 # Services
 class WeatherService:
     """Fetch weather data along route with robust fallbacks"""
@@ -57,7 +62,7 @@ class WeatherService:
                 "current": "temperature_2m,precipitation,wind_speed_10m,weathercode",
                 "timezone": "auto"
             }
-            response = requests.get(url, params=params, timeout=3)
+            response = http_session.get(url, params=params, timeout=3)
             if response.status_code == 200:
                 data = response.json()
                 if "current" in data:
@@ -104,7 +109,7 @@ class ElevationService:
         try:
             url = "https://api.open-elevation.com/api/v1/lookup"
             payload = {"locations": [{"latitude": lat, "longitude": lon}]}
-            response = requests.post(url, json=payload, timeout=2)
+            response = http_session.post(url, json=payload, timeout=2)
             if response.status_code == 200:
                 data = response.json()
                 if "results" in data and len(data["results"]) > 0:
@@ -136,7 +141,7 @@ class ElevationService:
         try:
             locations = [{"latitude": p[1], "longitude": p[0]} for p in samples]
             url = "https://api.open-elevation.com/api/v1/lookup"
-            response = requests.post(url, json={"locations": locations}, timeout=3)
+            response = http_session.post(url, json={"locations": locations}, timeout=3)
             if response.status_code == 200:
                 results = response.json().get("results", [])
                 elevations = [r["elevation"] for r in results]
@@ -216,6 +221,13 @@ class CostModel:
     FUEL_COST_PER_LITER = 100.0  # INR
     CO2_PER_LITER = 2.31
     
+    # Built once at import instead of on every call
+    TRAFFIC_MULTIPLIERS = {
+        TrafficCondition.NORMAL: 1.0,
+        TrafficCondition.MODERATE: 1.25,
+        TrafficCondition.HEAVY: 1.6
+    }
+    
     @classmethod
     def calculate(cls, 
                   distance_km: float, 
@@ -231,12 +243,7 @@ class CostModel:
         elev_cost = (ascent_m / 100.0) * 0.15
         
         # 3. Traffic Penalty
-        traffic_multipliers = {
-            TrafficCondition.NORMAL: 1.0,
-            TrafficCondition.MODERATE: 1.25,
-            TrafficCondition.HEAVY: 1.6
-        }
-        traffic_mult = traffic_multipliers.get(traffic, 1.0)
+        traffic_mult = cls.TRAFFIC_MULTIPLIERS.get(traffic, 1.0)
         
         # 4. Weather Penalty
         weather_factor = 1.0
@@ -291,7 +298,7 @@ class RouteFinder:
                 "geometries": "geojson",
                 "overview": "full"
             }
-            response = requests.get(url, params=params, timeout=5)
+            response = http_session.get(url, params=params, timeout=5)
             data = response.json()
             
             if data.get("code") == "Ok" and "routes" in data:
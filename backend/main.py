@@ -1,11 +1,8 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Tuple
-import random
-from enum import Enum
+from typing import List, Optional, Tuple
 import math
-import requests
 from datetime import datetime
 
 # Import core logic
@@ -15,8 +12,8 @@ from core import (
     ElevationService, 
     TrafficService, 
     CostModel, 
-    TrafficCondition, 
-    WeatherData
+    WeatherData,
+    http_session
 )
 from fastapi.responses import Response, FileResponse
 
@@ -80,6 +77,14 @@ class AlternativeRoute(BaseModel):
     weather_summary: Optional[str] = None
     traffic_summary: Optional[str] = None
 
+class AlternativesResponse(BaseModel):
+    # Typed so FastAPI serializes the models straight to JSON in one pass
+    # instead of model_dump() followed by jsonable_encoder
+    alternatives: List[AlternativeRoute]
+    origin_weather: Optional[WeatherData] = None
+    destination_weather: Optional[WeatherData] = None
+    current_time: str
+
 # --- Helper Logic ---
 
 def process_route_data(r_data, origin, destination, origin_lat, origin_lng, dest_lat, dest_lng):
@@ -153,8 +158,10 @@ async def health_check():
         "endpoints": ["/calculate-route", "/alternative-routes", "/recalculate", "/health"]
     }
 
+# The route handlers make blocking HTTP calls, so they are plain `def`:
+# FastAPI runs them in its threadpool instead of on the event loop
 @app.post("/calculate-route", response_model=RouteResponse)
-async def calculate_route(request: RouteRequest):
+def calculate_route(request: RouteRequest):
     """Calculate single optimal route"""
     if not (request.origin_lat and request.origin_lng and request.dest_lat and request.dest_lng):
         # Allow client to send text only, but we really need coords for core.py
@@ -204,7 +211,7 @@ def fetch_osrm_route(coords: List[Tuple[float, float]]) -> List[dict]:
             "geometries": "geojson",
             "overview": "full"
         }
-        response = requests.get(url, params=params, timeout=5)
+        response = http_session.get(url, params=params, timeout=5)
         data = response.json()
         if data.get("code") == "Ok" and "routes" in data:
             return data["routes"]
@@ -241,8 +248,8 @@ def get_deviation_point(olat, olng, dlat, dlng, offset_scale=0.05) -> Tuple[floa
     
     return (dev_lat, dev_lng)
 
-@app.post("/alternative-routes")
-async def get_alternative_routes(request: RouteRequest):
+@app.post("/alternative-routes", response_model=AlternativesResponse)
+def get_alternative_routes(request: RouteRequest):
     """Get 3 PHYSICALLY DISTINCT routes: Efficient, Fastest, Balanced"""
     if not (request.origin_lat and request.origin_lng and request.dest_lat and request.dest_lng):
         raise HTTPException(status_code=400, detail="Coordinates required")
@@ -301,11 +308,8 @@ async def get_alternative_routes(request: RouteRequest):
         raise HTTPException(status_code=404, detail="No unique routes found")
 
     # Find absolute bests regardless of previous sorting
-    candidates_by_time = sorted(processed_candidates, key=lambda x: x["metrics"].estimated_time_min)
-    true_fastest = candidates_by_time[0]
-    
-    candidates_by_co2 = sorted(processed_candidates, key=lambda x: x["metrics"].co2_kg)
-    true_efficient = candidates_by_co2[0]
+    true_fastest = min(processed_candidates, key=lambda x: x["metrics"].estimated_time_min)
+    true_efficient = min(processed_candidates, key=lambda x: x["metrics"].co2_kg)
     
     final_selection = []
 
@@ -367,8 +371,7 @@ async def get_alternative_routes(request: RouteRequest):
         remaining = [c for c in processed_candidates if get_geo_sig(c) != get_geo_sig(true_efficient) and get_geo_sig(c) != get_geo_sig(true_fastest)]
         
         if remaining:
-            remaining.sort(key=lambda x: x["metrics"].total_cost_score)
-            balanced = remaining[0]
+            balanced = min(remaining, key=lambda x: x["metrics"].total_cost_score)
             
             final_selection.append(AlternativeRoute(
                 route_name="Balanced Option",
@@ -396,41 +399,22 @@ async def get_alternative_routes(request: RouteRequest):
     origin_weather = WeatherService.get_weather(request.origin_lat, request.origin_lng)
     dest_weather = WeatherService.get_weather(request.dest_lat, request.dest_lng)
 
-    return {
-        "alternatives": [alt.model_dump() for alt in final_selection],
-        "origin_weather": origin_weather.model_dump() if origin_weather else None,
-        "destination_weather": dest_weather.model_dump() if dest_weather else None,
-        "current_time": datetime.now().isoformat()
-    }
-
-    # Rounding for display
-    for alt in final_selection:
-        alt.metrics.co2_kg = round(alt.metrics.co2_kg, 3)
-        alt.metrics.fuel_liters = round(alt.metrics.fuel_liters, 3)
-        alt.metrics.cost_usd = round(alt.metrics.cost_usd, 3)
-
-    # Weather
-    origin_weather = WeatherService.get_weather(request.origin_lat, request.origin_lng)
-    dest_weather = WeatherService.get_weather(request.dest_lat, request.dest_lng)
-
-    return {
-        "alternatives": [alt.model_dump() for alt in final_selection],
-        "origin_weather": origin_weather.model_dump() if origin_weather else None,
-        "destination_weather": dest_weather.model_dump() if dest_weather else None,
-        "current_time": datetime.now().isoformat()
-    }
+    return AlternativesResponse(
+        alternatives=final_selection,
+        origin_weather=origin_weather,
+        destination_weather=dest_weather,
+        current_time=datetime.now().isoformat()
+    )
 
 @app.post("/recalculate")
-async def recalculate_route(request: RouteRequest):
+def recalculate_route(request: RouteRequest):
     """Dynamic Recalculation"""
     # Just reuse calculate logic
     return {
         "message": "Recalculated",
-        "route": await calculate_route(request)
+        "route": calculate_route(request)
     }
 
-    return {"status": "healthy", "service": "EcoRoute API (Core Integrated)"}
-
 class TTSRequest(BaseModel):
     text: str
 
@@ -1,9 +1,12 @@
-import requests
+import asyncio
 import httpx
+import orjson
 import math
-import random
+import os
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Callable, Awaitable
 from enum import Enum
 from pydantic import BaseModel
 
@@ -40,23 +43,135 @@ class RouteExplanation(BaseModel):
     factors: List[str]
     confidence: str
 
+# Caching
+class TTLCache:
+    """Small LRU cache whose entries expire after a fixed time-to-live"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+class SingleFlight:
+    """Share one in-flight upstream call among concurrent callers asking for the same key"""
+
+    def __init__(self):
+        self._inflight: Dict[Any, "asyncio.Future"] = {}
+
+    async def run(self, key, fetch: Callable[[], Awaitable[Any]]):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller giving up doesn't cancel the fetch the others are waiting on
+        return await asyncio.shield(task)
+
+# Shared HTTP client: one connection pool reused by every upstream API call
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Keep-alive pool sized for the fan-out of a few concurrent route requests
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30)
+
+# Connect and pool waits fail fast so a cold or saturated upstream doesn't eat the
+# whole budget; reads get the rest. QUICK_TIMEOUT is for the small lookups.
+HTTP_TIMEOUT = httpx.Timeout(5.0, connect=2.0, pool=1.0)
+QUICK_TIMEOUT = httpx.Timeout(3.0, connect=2.0, pool=1.0)
+
+# Sent on every upstream call (Nominatim's usage policy requires an identifying User-Agent)
+HTTP_HEADERS = {"User-Agent": "EcoRouteOptimizer/1.0"}
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide AsyncClient, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        # HTTP/2 multiplexes concurrent calls to the same host over one TLS session;
+        # retries only cover connection setup failures, never a sent request
+        transport = httpx.AsyncHTTPTransport(http2=True, limits=HTTP_LIMITS, retries=2)
+        _http_client = httpx.AsyncClient(transport=transport, headers=HTTP_HEADERS, timeout=HTTP_TIMEOUT)
+    return _http_client
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    _upstream_semaphores.clear()
+
+# OSRM server; the public demo by default, point at a self-hosted osrm-routed to skip
+# its rate limits and Internet round trip (e.g. OSRM_URL=http://localhost:5000)
+OSRM_URL = os.getenv("OSRM_URL", "https://router.project-osrm.org").rstrip("/")
+
+# Max in-flight calls per shared public upstream. The semaphores are per process, so
+# with several uvicorn workers the cap per client IP is this times WEB_CONCURRENCY
+UPSTREAM_CONCURRENCY = {"osrm": 5, "open-meteo": 10}
+
+# Statuses worth one more try after a short backoff (rate limited / temporarily down)
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+UPSTREAM_RETRIES = 1
+
+# Created on first use so they belong to the running event loop
+_upstream_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+async def upstream_get(upstream: str, url: str, **kwargs) -> httpx.Response:
+    """GET on the shared client, bounded by the upstream's concurrency cap"""
+    semaphore = _upstream_semaphores.get(upstream)
+    if semaphore is None:
+        semaphore = _upstream_semaphores[upstream] = asyncio.Semaphore(UPSTREAM_CONCURRENCY[upstream])
+    async with semaphore:
+        for attempt in range(UPSTREAM_RETRIES + 1):
+            response = await get_http_client().get(url, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == UPSTREAM_RETRIES:
+                return response
+            await asyncio.sleep(0.25 * 2 ** attempt)
+
 # Services
 class GeocodingService:
     """Resolve addresses to coordinates"""
     
+    # Place names don't move; a week also keeps repeat lookups off Nominatim's 1 req/s budget
+    _cache = TTLCache(maxsize=4096, ttl=7 * 86400)
+    _flights = SingleFlight()
+
     @staticmethod
     async def get_coordinates(query: str) -> Optional[Tuple[float, float]]:
         if not query: return None
+        cache_key = query.strip().lower()
+        cached = GeocodingService._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return await GeocodingService._flights.run(
+            cache_key, lambda: GeocodingService._fetch_coordinates(query, cache_key))
+
+    @staticmethod
+    async def _fetch_coordinates(query: str, cache_key: str) -> Optional[Tuple[float, float]]:
         try:
             url = "https://nominatim.openstreetmap.org/search"
             params = {"q": query, "format": "json", "limit": 1}
-            headers = {"User-Agent": "EcoRouteOptimizer/1.0"}
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, headers=headers, timeout=5)
+            response = await get_http_client().get(url, params=params)
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if data:
-                    return float(data[0]["lat"]), float(data[0]["lon"])
+                    coords = float(data[0]["lat"]), float(data[0]["lon"])
+                    GeocodingService._cache.set(cache_key, coords)
+                    return coords
         except Exception:
             pass
         return None
@@ -64,50 +179,143 @@ class GeocodingService:
 class WeatherService:
     """Fetch weather data along route with robust fallbacks"""
     
+    # Live readings keyed on a ~1 km grid; 10 min matches Open-Meteo's refresh cadence
+    _cache = TTLCache(maxsize=4096, ttl=600)
+    # (etag, last_modified, weather) of past readings, so a refresh can be answered with 304
+    _validators = TTLCache(maxsize=4096, ttl=3600)
+    _flights = SingleFlight()
+
+    # Fixed part of the forecast query, encoded once; only the coordinates vary
+    FORECAST_URL = ("https://api.open-meteo.com/v1/forecast"
+                    "?current=temperature_2m,precipitation,wind_speed_10m,weathercode&timezone=auto")
+
+    # WMO weather interpretation codes used by Open-Meteo
+    WEATHER_CODES = {
+        0: "Clear", 1: "Mainly Clear", 2: "Partly Cloudy", 3: "Overcast",
+        45: "Foggy", 48: "Foggy", 51: "Light Drizzle", 53: "Drizzle",
+        55: "Heavy Drizzle", 61: "Light Rain", 63: "Rain", 65: "Heavy Rain",
+        71: "Light Snow", 73: "Snow", 75: "Heavy Snow", 95: "Thunderstorm"
+    }
+    
     @staticmethod
     async def get_weather(lat: float, lon: float) -> WeatherData:
         """
         Primary: Open-Meteo API
         Fallback: Climatological average / Safe defaults
         """
+        cache_key = (round(lat, 2), round(lon, 2))
+        cached = WeatherService._cache.get(cache_key)
+        if cached is not None:
+            # Callers (e.g. the agent simulation) may mutate what they get back
+            return cached.model_copy()
+
+        weather = await WeatherService._flights.run(
+            cache_key, lambda: WeatherService._fetch_weather(lat, lon, cache_key))
+        return weather.model_copy()
+
+    @staticmethod
+    async def _fetch_weather(lat: float, lon: float, cache_key: Tuple[float, float]) -> WeatherData:
+        """Live reading for one point; shared by every concurrent caller, so never mutate it"""
         try:
-            url = f"https://api.open-meteo.com/v1/forecast"
-            params = {
-                "latitude": lat,
-                "longitude": lon,
-                "current": "temperature_2m,precipitation,wind_speed_10m,weathercode",
-                "timezone": "auto"
-            }
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, timeout=3)
+            url = f"{WeatherService.FORECAST_URL}&latitude={lat}&longitude={lon}"
+            # Revalidate the last reading instead of downloading it again if unchanged
+            headers = {}
+            validators = WeatherService._validators.get(cache_key)
+            if validators is not None:
+                etag, last_modified, _ = validators
+                if etag: headers["If-None-Match"] = etag
+                if last_modified: headers["If-Modified-Since"] = last_modified
+            response = await upstream_get("open-meteo", url, headers=headers, timeout=QUICK_TIMEOUT)
             
+            if response.status_code == 304 and validators is not None:
+                weather = validators[2]
+                WeatherService._cache.set(cache_key, weather)
+                return weather
+
             if response.status_code == 200:
-                data = response.json()
-                if "current" in data:
-                    current = data["current"]
-                    
-                    weather_codes = {
-                        0: "Clear", 1: "Mainly Clear", 2: "Partly Cloudy", 3: "Overcast",
-                        45: "Foggy", 48: "Foggy", 51: "Light Drizzle", 53: "Drizzle",
-                        55: "Heavy Drizzle", 61: "Light Rain", 63: "Rain", 65: "Heavy Rain",
-                        71: "Light Snow", 73: "Snow", 75: "Heavy Snow", 95: "Thunderstorm"
-                    }
-                    
-                    weather_code = current.get("weathercode", 0)
-                    condition = weather_codes.get(weather_code, "Unknown")
-                    
-                    return WeatherData(
-                        temperature=current.get("temperature_2m", 20),
-                        condition=condition,
-                        wind_speed=current.get("wind_speed_10m", 0),
-                        precipitation=current.get("precipitation", 0),
-                        visibility=10.0,
-                        weather_code=weather_code,
-                        is_fallback=False
-                    )
+                weather = WeatherService._parse_current(orjson.loads(response.content))
+                if weather is not None:
+                    WeatherService._cache.set(cache_key, weather)
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if etag or last_modified:
+                        WeatherService._validators.set(cache_key, (etag, last_modified, weather))
+                    return weather
         except Exception:
             pass
             
+        return WeatherService._fallback()
+
+    @staticmethod
+    async def get_weather_many(points: List[Tuple[float, float]]) -> List[WeatherData]:
+        """
+        Weather at several (lat, lon) points, in order. Open-Meteo accepts
+        comma-separated coordinates, so all uncached points share one request.
+        """
+        results: List[Optional[WeatherData]] = []
+        missing = []
+        for i, (lat, lon) in enumerate(points):
+            cached = WeatherService._cache.get((round(lat, 2), round(lon, 2)))
+            results.append(cached.model_copy() if cached is not None else None)
+            if cached is None:
+                missing.append(i)
+
+        if len(missing) == 1:
+            # Single point: keep conditional revalidation
+            results[missing[0]] = await WeatherService.get_weather(*points[missing[0]])
+        elif missing:
+            # Concurrent requests for the same set of points share one upstream call
+            cache_keys = tuple((round(points[i][0], 2), round(points[i][1], 2)) for i in missing)
+            fetched = await WeatherService._flights.run(
+                cache_keys, lambda: WeatherService._fetch_weather_batch([points[i] for i in missing], cache_keys))
+            for i, weather in zip(missing, fetched):
+                if weather is not None:
+                    results[i] = weather.model_copy()
+
+        return [w if w is not None else WeatherService._fallback() for w in results]
+
+    @staticmethod
+    async def _fetch_weather_batch(points: List[Tuple[float, float]],
+                                   cache_keys: Tuple[Tuple[float, float], ...]) -> List[Optional[WeatherData]]:
+        """Live readings for several points in one request (None where missing); shared, so never mutate them"""
+        try:
+            lats = ",".join(str(lat) for lat, _ in points)
+            lons = ",".join(str(lon) for _, lon in points)
+            url = f"{WeatherService.FORECAST_URL}&latitude={lats}&longitude={lons}"
+            response = await upstream_get("open-meteo", url, timeout=QUICK_TIMEOUT)
+            if response.status_code == 200:
+                # One object per location, in request order
+                readings = [WeatherService._parse_current(data) for data in orjson.loads(response.content)]
+                for cache_key, weather in zip(cache_keys, readings):
+                    if weather is not None:
+                        WeatherService._cache.set(cache_key, weather)
+                return readings
+        except Exception:
+            pass
+        return [None] * len(points)
+
+    @staticmethod
+    def _parse_current(data: Dict[str, Any]) -> Optional[WeatherData]:
+        """WeatherData from one Open-Meteo location object, or None if it has no reading"""
+        if "current" not in data:
+            return None
+        current = data["current"]
+        
+        weather_code = current.get("weathercode", 0)
+        condition = WeatherService.WEATHER_CODES.get(weather_code, "Unknown")
+        
+        return WeatherData(
+            temperature=current.get("temperature_2m", 20),
+            condition=condition,
+            wind_speed=current.get("wind_speed_10m", 0),
+            precipitation=current.get("precipitation", 0),
+            visibility=10.0,
+            weather_code=weather_code,
+            is_fallback=False
+        )
+
+    @staticmethod
+    def _fallback() -> WeatherData:
         # Fallback: Conservative assumptions (assume slightly adverse to be safe)
         return WeatherData(
             temperature=15.0,
@@ -121,21 +329,14 @@ class WeatherService:
 class ElevationService:
     """Fetch elevation data and compute stats"""
     
-    @staticmethod
-    async def get_elevation_point(lat: float, lon: float) -> float:
-        """Fetch single point elevation"""
-        try:
-            url = "https://api.open-elevation.com/api/v1/lookup"
-            payload = {"locations": [{"latitude": lat, "longitude": lon}]}
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if "results" in data and len(data["results"]) > 0:
-                    return float(data["results"][0]["elevation"])
-        except Exception:
-            pass
-        return 0.0 # Default if failed
+    # Terrain doesn't change; candidates sharing a sampled profile reuse the result,
+    # and sample points already looked up (e.g. near shared endpoints) skip the POST
+    _stats_cache = TTLCache(maxsize=1024, ttl=86400)
+    _point_cache = TTLCache(maxsize=4096, ttl=86400)
+    
+    # Upper bound on points sampled per route, and on points per lookup POST
+    MAX_SAMPLES = 40
+    MAX_BATCH = 512
 
     @staticmethod
     async def get_route_elevation_stats(geometry_coords: List[List[float]]) -> Tuple[float, float]:
@@ -144,50 +345,128 @@ class ElevationService:
         geometry_coords: List of [lon, lat] (GeoJSON format)
         Returns: (ascent_m, descent_m)
         """
-        if not geometry_coords or len(geometry_coords) < 2:
-            return 0.0, 0.0
-
-        # Decimate to avoid too many requests (increased for accuracy)
-        # In prod, we'd batch-request hundreds of points.
-        step = max(1, len(geometry_coords) // 40)
-        samples = geometry_coords[::step]
-        if samples[-1] != geometry_coords[-1]:
-            samples.append(geometry_coords[-1])
-
-        elevations = []
-        # Try to batch fetch if API supports, otherwise loop (slow, so we limit samples)
-        # Open-Elevation supports batching.
-        try:
-            locations = [{"latitude": p[1], "longitude": p[0]} for p in samples]
-            url = "https://api.open-elevation.com/api/v1/lookup"
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json={"locations": locations}, timeout=3)
-            if response.status_code == 200:
-                results = response.json().get("results", [])
-                elevations = [r["elevation"] for r in results]
-        except Exception:
-            pass
+        stats = await ElevationService.get_routes_elevation_stats([geometry_coords])
+        return stats[0]
+
+    @staticmethod
+    async def get_routes_elevation_stats(geometries: List[List[List[float]]]) -> List[Tuple[float, float]]:
+        """
+        Same as get_route_elevation_stats for several routes at once. Samples of
+        every uncached route are sent in one batched lookup.
+        Returns: [(ascent_m, descent_m), ...] in input order
+        """
+        stats: List[Tuple[float, float]] = [(0.0, 0.0)] * len(geometries)
+        pending = []  # (route index, cache key, samples) still needing elevations
+
+        for i, geometry_coords in enumerate(geometries):
+            if not geometry_coords or len(geometry_coords) < 2:
+                continue
+
+            # Decimate to at most MAX_SAMPLES evenly spaced points (both endpoints
+            # included) however long the route is; the samples of every pending route
+            # then go out together, MAX_BATCH points per POST, in get_elevations_batch.
+            n_samples = ElevationService.MAX_SAMPLES
+            last = len(geometry_coords) - 1
+            if last < n_samples:
+                samples = geometry_coords
+            else:
+                samples = [geometry_coords[(j * last) // (n_samples - 1)] for j in range(n_samples)]
+
+            cache_key = tuple((round(p[0], 4), round(p[1], 4)) for p in samples)
+            cached = ElevationService._stats_cache.get(cache_key)
+            if cached is not None:
+                stats[i] = cached
+            else:
+                pending.append((i, cache_key, samples))
+
+        if not pending:
+            return stats
+
+        elevations = await ElevationService.get_elevations_batch(
+            [p for _, _, samples in pending for p in samples]
+        )
 
         # Fallback if batch failed or empty
         if not elevations:
             # Heuristic: 0 elevation change
-            return 0.0, 0.0
+            return stats
+
+        # Split the flat result back into per-route profiles
+        offset = 0
+        for i, cache_key, samples in pending:
+            route_elevations = elevations[offset:offset + len(samples)]
+            offset += len(samples)
+            stats[i] = ElevationService.ascent_descent(route_elevations)
+            ElevationService._stats_cache.set(cache_key, stats[i])
+        return stats
+
+    @staticmethod
+    async def get_elevations_batch(points: List[List[float]]) -> List[float]:
+        """
+        Elevation (m) for each [lon, lat] point, in order. Points seen before come from
+        the per-point cache; Open-Elevation supports batching, so the rest go out in as
+        few POSTs as MAX_BATCH allows.
+        Returns [] if any part of the lookup failed.
+        """
+        url = "https://api.open-elevation.com/api/v1/lookup"
+        batch = ElevationService.MAX_BATCH
+
+        keys = [(round(p[0], 4), round(p[1], 4)) for p in points]
+        elevations: List[Optional[float]] = [ElevationService._point_cache.get(k) for k in keys]
+        # One lookup per distinct uncached point
+        missing = list(dict.fromkeys(k for k, elev in zip(keys, elevations) if elev is None))
+        if not missing:
+            return elevations
 
+        async def fetch_chunk(chunk: List[Tuple[float, float]]) -> List[float]:
+            locations = [{"latitude": lat, "longitude": lon} for lon, lat in chunk]
+            response = await get_http_client().post(url, json={"locations": locations}, timeout=QUICK_TIMEOUT)
+            if response.status_code != 200:
+                return []
+            results = orjson.loads(response.content).get("results", [])
+            return [r["elevation"] for r in results]
+
+        try:
+            chunks = await asyncio.gather(
+                *(fetch_chunk(missing[k:k + batch]) for k in range(0, len(missing), batch))
+            )
+        except Exception:
+            return []
+
+        fetched = [elev for chunk in chunks for elev in chunk]
+        if len(fetched) != len(missing):
+            return []
+        for key, elev in zip(missing, fetched):
+            ElevationService._point_cache.set(key, elev)
+        found = dict(zip(missing, fetched))
+        return [elev if elev is not None else found[k] for k, elev in zip(keys, elevations)]
+
+    @staticmethod
+    def ascent_descent(elevations: List[float]) -> Tuple[float, float]:
+        """Total climb and drop (m) over consecutive elevation samples"""
         ascent = 0.0
         descent = 0.0
-        
-        for i in range(len(elevations) - 1):
-            diff = elevations[i+1] - elevations[i]
+        prev = elevations[0]
+        for elev in elevations[1:]:
+            diff = elev - prev
             if diff > 0:
                 ascent += diff
             else:
-                descent += abs(diff)
-                
+                descent -= diff
+            prev = elev
         return ascent, descent
 
 class TrafficService:
     """Fetch or infer traffic data with strict fallback hierarchy"""
     
+    # Typical condition for each hour of the day (index = hour)
+    HOURLY_TRAFFIC = tuple(
+        TrafficCondition.HEAVY if hour in (8, 9, 17, 18)
+        else TrafficCondition.MODERATE if hour in (7, 10, 16, 19)
+        else TrafficCondition.NORMAL
+        for hour in range(24)
+    )
+    
     @staticmethod
     def get_traffic(lat: float, lon: float, duration_osrm: float, distance_km: float) -> TrafficCondition:
         """
@@ -227,12 +506,7 @@ class TrafficService:
 
     @staticmethod
     def _estimate_historical() -> TrafficCondition:
-        hour = datetime.now().hour
-        if hour in [8, 9, 17, 18]:
-            return TrafficCondition.HEAVY
-        elif hour in [7, 10, 16, 19]:
-            return TrafficCondition.MODERATE
-        return TrafficCondition.NORMAL
+        return TrafficService.HOURLY_TRAFFIC[datetime.now().hour]
 
 class CostModel:
     """Unified Cost Model"""
@@ -241,6 +515,19 @@ class CostModel:
     FUEL_COST_PER_LITER = 100.0  # INR
     CO2_PER_LITER = 2.31
     
+    # Coefficient tables, built once at import instead of on every call
+    ELEVATION_FUEL_PER_100M = 0.15  # Liters per 100 m climbed
+    VALUE_OF_TIME_PER_HOUR = 500.0  # INR
+    TIME_COST_WEIGHT = 0.5
+    TRAFFIC_MULTIPLIERS = {
+        TrafficCondition.NORMAL: 1.0,
+        TrafficCondition.MODERATE: 1.25,
+        TrafficCondition.HEAVY: 1.6
+    }
+    RAIN_PENALTY = 0.1
+    WIND_PENALTY = 0.05
+    WIND_PENALTY_THRESHOLD = 25  # km/h
+    
     @classmethod
     def calculate(cls, 
                   distance_km: float, 
@@ -249,53 +536,107 @@ class CostModel:
                   traffic: TrafficCondition,
                   weather: Optional[WeatherData] = None,
                   fuel_efficiency: float = 8.0) -> RouteMetrics:
-        
+        base = cls.base_costs(distance_km, duration_min, ascent_m, fuel_efficiency)
+        return cls.recalculate_with_env(base, traffic, weather)
+
+    @classmethod
+    def base_costs(cls,
+                   distance_km: float,
+                   duration_min: float,
+                   ascent_m: float,
+                   fuel_efficiency: float = 8.0) -> Dict[str, float]:
+        """
+        Route-invariant part of the model. Compute once per route and feed to
+        recalculate_with_env whenever only traffic/weather change.
+        """
         # Convert L/100km to L/km
         base_fuel_per_km = fuel_efficiency / 100.0
         
-        # 1. Distance Cost
-        dist_cost = distance_km * base_fuel_per_km
-        
-        # 2. Elevation Penalty
-        elev_cost = (ascent_m / 100.0) * 0.15
-        
-        # 3. Traffic Penalty
-        traffic_multipliers = {
-            TrafficCondition.NORMAL: 1.0,
-            TrafficCondition.MODERATE: 1.25,
-            TrafficCondition.HEAVY: 1.6
+        return {
+            "distance_km": distance_km,
+            "duration_min": duration_min,
+            "ascent_m": ascent_m,
+            # 1. Distance Cost
+            "distance_cost": distance_km * base_fuel_per_km,
+            # 2. Elevation Penalty
+            "elevation_cost": (ascent_m / 100.0) * cls.ELEVATION_FUEL_PER_100M,
+            # Value of time in INR (~₹500/hr)
+            "time_cost": (duration_min / 60.0) * cls.VALUE_OF_TIME_PER_HOUR
         }
-        traffic_mult = traffic_multipliers.get(traffic, 1.0)
-        
-        # 4. Weather Penalty
+
+    @classmethod
+    def calculate_batch(cls,
+                        bases: List[Dict[str, float]],
+                        traffics: List[TrafficCondition],
+                        weather: Optional[WeatherData] = None) -> List[RouteMetrics]:
+        """Score several routes under the same weather; the weather factor is derived once"""
+        weather_factor = cls.weather_multiplier(weather)
+        return [
+            cls.recalculate_with_env(base, traffic, weather, weather_factor)
+            for base, traffic in zip(bases, traffics)
+        ]
+
+    @classmethod
+    def min_possible_cost(cls, base: Dict[str, float]) -> float:
+        """
+        Lower bound on total_cost_score for a route: traffic and weather
+        multipliers are never below 1.0, so score it with both at 1.0.
+        """
+        fuel_liters = base["distance_cost"] + base["elevation_cost"]
+        return round(fuel_liters * cls.FUEL_COST_PER_LITER + base["time_cost"] * cls.TIME_COST_WEIGHT, 2)
+
+    @classmethod
+    def weather_multiplier(cls, weather: Optional[WeatherData]) -> float:
         weather_factor = 1.0
         if weather:
             if weather.precipitation > 0:
-                weather_factor += 0.1
-            if weather.wind_speed > 25:
-                weather_factor += 0.05
+                weather_factor += cls.RAIN_PENALTY
+            if weather.wind_speed > cls.WIND_PENALTY_THRESHOLD:
+                weather_factor += cls.WIND_PENALTY
+        return weather_factor
+
+    @classmethod
+    def recalculate_with_env(cls,
+                             base: Dict[str, float],
+                             traffic: TrafficCondition,
+                             weather: Optional[WeatherData] = None,
+                             weather_factor: Optional[float] = None) -> RouteMetrics:
+        """
+        Apply traffic/weather multipliers to precomputed base costs.
+        `weather_factor` may be passed in when it was already derived for this weather.
+        """
+        dist_cost = base["distance_cost"]
+        elev_cost = base["elevation_cost"]
+        
+        # 3. Traffic Penalty
+        traffic_mult = cls.TRAFFIC_MULTIPLIERS.get(traffic, 1.0)
+        
+        # 4. Weather Penalty
+        if weather_factor is None:
+            weather_factor = cls.weather_multiplier(weather)
                 
         # Total Fuel Estimate (Physical)
         estimated_fuel_liters = (dist_cost + elev_cost) * traffic_mult * weather_factor
         
         # Monetary Cost (INR)
         fuel_cost_inr = estimated_fuel_liters * cls.FUEL_COST_PER_LITER
-        time_cost_inr = (duration_min / 60.0) * 500.0 # Value of time in INR (~₹500/hr)
         
-        total_cost_score = fuel_cost_inr + (time_cost_inr * 0.5)
+        total_cost_score = fuel_cost_inr + (base["time_cost"] * cls.TIME_COST_WEIGHT)
         
         # Confidence
         confidence = 1.0
         if weather and weather.is_fallback: confidence *= 0.8
         if traffic == TrafficCondition.HEAVY: confidence *= 0.9
         
-        return RouteMetrics(
+        # Every field is a float computed above, so skip pydantic validation;
+        # this runs once per candidate per simulation tick
+        return RouteMetrics.model_construct(
             fuel_liters=round(estimated_fuel_liters, 2),
             co2_kg=round(estimated_fuel_liters * cls.CO2_PER_LITER, 3),
             cost_usd=round(fuel_cost_inr, 2), # Note: kept field name cost_usd for API compatibility but value is INR
-            distance_km=round(distance_km, 1),
-            elevation_gain_m=round(ascent_m, 0),
-            estimated_time_min=round(duration_min, 0),
+            distance_km=round(base["distance_km"], 1),
+            elevation_gain_m=round(base["ascent_m"], 0),
+            estimated_time_min=round(base["duration_min"], 0),
             total_cost_score=round(total_cost_score, 2),
             confidence_score=round(confidence, 2),
             breakdown={
@@ -307,24 +648,47 @@ class CostModel:
         )
 
 class RouteFinder:
+    # The public OSRM profile has no live traffic, so an OD pair's routes are stable for hours;
+    # keyed on ~11 m rounded coords
+    _cache = TTLCache(maxsize=4096, ttl=21600)
+    _flights = SingleFlight()
+    # Nearest road point of a via point; the road network doesn't move either
+    _snap_cache = TTLCache(maxsize=4096, ttl=21600)
+    _snap_flights = SingleFlight()
+
+    # Fixed part of the route query, encoded once; alternatives/overview are appended per call
+    ROUTE_QUERY = "steps=false&geometries=geojson"
+
     @staticmethod
-    async def get_routes(origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float) -> List[Dict]:
+    async def get_routes(origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float,
+                         overview: str = "full", alternatives: int = 3) -> List[Dict]:
         """
         Fetch routes from OSRM. Returns list of dicts.
+        overview: "full" when the polyline is drawn on the map; "simplified" is enough
+        for elevation sampling and the traffic midpoint and is a fraction of the payload.
+        alternatives: max alternatives besides the primary route; 0 for the primary only.
         """
+        cache_key = (round(origin_lat, 4), round(origin_lng, 4), round(dest_lat, 4), round(dest_lng, 4),
+                     overview, alternatives)
+        cached = RouteFinder._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return await RouteFinder._flights.run(
+            cache_key, lambda: RouteFinder._fetch_routes(origin_lat, origin_lng, dest_lat, dest_lng,
+                                                         overview, alternatives, cache_key))
+
+    @staticmethod
+    async def _fetch_routes(origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float,
+                            overview: str, alternatives: int, cache_key: Tuple) -> List[Dict]:
         try:
-            url = f"https://router.project-osrm.org/route/v1/driving/{origin_lng},{origin_lat};{dest_lng},{dest_lat}"
-            params = {
-                "alternatives": "true",
-                "steps": "false",
-                "geometries": "geojson",
-                "overview": "full"
-            }
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, timeout=5)
-            data = response.json()
+            url = (f"{OSRM_URL}/route/v1/driving/"
+                   f"{origin_lng},{origin_lat};{dest_lng},{dest_lat}?{RouteFinder.ROUTE_QUERY}"
+                   f"&alternatives={alternatives or 'false'}&overview={overview}")
+            response = await upstream_get("osrm", url)
+            data = orjson.loads(response.content)
             
             if data.get("code") == "Ok" and "routes" in data:
+                RouteFinder._cache.set(cache_key, data["routes"])
                 return data["routes"]
         except Exception:
             pass
@@ -341,15 +705,25 @@ class RouteFinder:
     @staticmethod
     async def snap_to_road(lat: float, lon: float) -> Tuple[float, float]:
         """Snap coordinate to nearest road using OSRM"""
+        cache_key = (round(lat, 4), round(lon, 4))
+        cached = RouteFinder._snap_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return await RouteFinder._snap_flights.run(
+            cache_key, lambda: RouteFinder._fetch_snap(lat, lon, cache_key))
+
+    @staticmethod
+    async def _fetch_snap(lat: float, lon: float, cache_key: Tuple[float, float]) -> Tuple[float, float]:
         try:
-            url = f"https://router.project-osrm.org/nearest/v1/driving/{lon},{lat}"
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=3)
+            url = f"{OSRM_URL}/nearest/v1/driving/{lon},{lat}"
+            response = await upstream_get("osrm", url, timeout=QUICK_TIMEOUT)
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if data.get("code") == "Ok" and data.get("waypoints"):
                     loc = data["waypoints"][0]["location"]
-                    return float(loc[1]), float(loc[0]) # lat, lon
+                    snapped = float(loc[1]), float(loc[0]) # lat, lon
+                    RouteFinder._snap_cache.set(cache_key, snapped)
+                    return snapped
         except Exception:
             pass
         return lat, lon
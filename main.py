@@ -1,12 +1,17 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, validator
-from typing import List, Optional, Dict, Tuple
-import random
-from enum import Enum
+from typing import List, Optional, Tuple
 import math
-import httpx
+import asyncio
+import orjson
+from contextlib import asynccontextmanager
 from datetime import datetime
+from dotenv import load_dotenv
+
+# Load environment variables (before core, which reads OSRM_URL at import)
+load_dotenv()
 
 # Import core logic
 from core import (
@@ -15,21 +20,27 @@ from core import (
     ElevationService, 
     TrafficService, 
     CostModel, 
-    TrafficCondition, 
     WeatherData,
-    GeocodingService
+    GeocodingService,
+    TTLCache,
+    SingleFlight,
+    close_http_client,
+    upstream_get,
+    OSRM_URL
 )
-from fastapi.responses import Response, FileResponse
+from fastapi.responses import Response, FileResponse, StreamingResponse
 
 import edge_tts
-import tempfile
-import os
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The shared client is created lazily on first use; close its pool on shutdown
+    try:
+        yield
+    finally:
+        await close_http_client()
 
-app = FastAPI(title="EcoRoute Optimizer API")
+app = FastAPI(title="EcoRoute Optimizer API", lifespan=lifespan)
 
 # Configuration
 # No API Key needed for Edge TTS
@@ -43,6 +54,10 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization"],
 )
 
+# Route geometry is long runs of coordinate text; gzip cuts it several-fold with
+# no change for clients (browsers decode transparently)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # --- API Models (kept compatible with Frontend) ---
 
 class RouteRequest(BaseModel):
@@ -85,6 +100,10 @@ class RouteResponse(BaseModel):
     waypoints: List[dict]
     tips: List[str]
 
+class RecalculateResponse(BaseModel):
+    message: str
+    route: RouteResponse
+
 class AlternativeRoute(BaseModel):
     route_name: str
     route_type: str  # "fastest", "shortest", "most_efficient"
@@ -94,11 +113,25 @@ class AlternativeRoute(BaseModel):
     weather_summary: Optional[str] = None
     traffic_summary: Optional[str] = None
 
+class AlternativesResponse(BaseModel):
+    # Typed so FastAPI serializes the models straight to JSON in one pass
+    # instead of model_dump() followed by jsonable_encoder
+    alternatives: List[AlternativeRoute]
+    origin_weather: Optional[WeatherData] = None
+    destination_weather: Optional[WeatherData] = None
+    current_time: str
+
 # --- Helper Logic ---
 
-async def process_route_data(r_data, origin, destination, origin_lat, origin_lng, dest_lat, dest_lng, fuel_efficiency=8.0):
+async def process_route_data(r_data, origin, destination, origin_lat, origin_lng, dest_lat, dest_lng, fuel_efficiency=8.0,
+                             weather: Optional[WeatherData] = None,
+                             elevation: Optional[Tuple[float, float]] = None,
+                             waypoints: Optional[List[dict]] = None):
     """
     Helper to process raw OSRM route data into enriched RouteMetrics using core.py services.
+    Pass `weather` when the caller already has the origin weather to skip refetching it,
+    and `elevation` (ascent, descent) when it was already looked up in a batch.
+    `waypoints` may be shared across candidates of one request (it is never mutated).
     """
     # 1. Extract basic stats
     distance_km = r_data.get("distance", 0) / 1000.0
@@ -106,11 +139,12 @@ async def process_route_data(r_data, origin, destination, origin_lat, origin_lng
     geometry = r_data.get("geometry", {}).get("coordinates", [])
 
     # 2. Get Real Environment Data
-    # Elevation (Sampled from route geometry)
-    ascent, descent = await ElevationService.get_route_elevation_stats(geometry)
-    
-    # Weather (At origin)
-    weather = await WeatherService.get_weather(origin_lat, origin_lng)
+    # Elevation (Sampled from route geometry) and weather (At origin), unless the caller has them
+    if elevation is None:
+        elevation = await ElevationService.get_route_elevation_stats(geometry)
+    ascent, descent = elevation
+    if weather is None:
+        weather = await WeatherService.get_weather(origin_lat, origin_lng)
     
     # Traffic (Inferred or Real)
     mid_point = geometry[len(geometry)//2] if geometry else [origin_lng, origin_lat]
@@ -121,7 +155,8 @@ async def process_route_data(r_data, origin, destination, origin_lat, origin_lng
     core_metrics = CostModel.calculate(distance_km, duration_min, ascent, traffic_enum, weather, fuel_efficiency)
     
     # 4. Map to API Model
-    metrics = RouteMetrics(
+    # Fields come straight from CostModel's own output, so skip revalidating them
+    metrics = RouteMetrics.model_construct(
         fuel_liters=core_metrics.fuel_liters,
         co2_kg=core_metrics.co2_kg,
         cost_usd=core_metrics.cost_usd,
@@ -133,28 +168,59 @@ async def process_route_data(r_data, origin, destination, origin_lat, origin_lng
     )
     
     # Create Waypoints list for frontend
-    waypoints = [
-        {"lat": origin_lat, "lng": origin_lng, "name": origin},
-        {"lat": dest_lat, "lng": dest_lng, "name": destination}
-    ]
+    if waypoints is None:
+        waypoints = [
+            {"lat": origin_lat, "lng": origin_lng, "name": origin},
+            {"lat": dest_lat, "lng": dest_lng, "name": destination}
+        ]
     
     # Summaries
     w_sum = f"{weather.temperature}°C, {weather.condition}" if weather else "Unknown"
     t_sum = f"{traffic_enum.value.title()} Traffic"
     
-    # Convert geometry for Leaflet (Lat, Lng)
-    geo_latlng = [[p[1], p[0]] for p in geometry]
-    
     return {
         "metrics": metrics,
         "traffic": traffic_enum,
         "weather": weather,
         "waypoints": waypoints,
-        "geometry": geo_latlng,
+        "geometry": geometry, # GeoJSON [lng, lat]; see to_leaflet_geometry
         "weather_summary": w_sum,
         "traffic_summary": t_sum
     }
 
+async def geocode_missing_endpoints(request: RouteRequest) -> None:
+    """Fill in whichever endpoint coordinates are missing; both lookups run concurrently"""
+    async def resolve(query: str, lat: Optional[float], lng: Optional[float]):
+        if lat and lng:
+            return None
+        return await GeocodingService.get_coordinates(query)
+
+    origin_coords, dest_coords = await asyncio.gather(
+        resolve(request.origin, request.origin_lat, request.origin_lng),
+        resolve(request.destination, request.dest_lat, request.dest_lng)
+    )
+    if origin_coords:
+        request.origin_lat, request.origin_lng = origin_coords
+    if dest_coords:
+        request.dest_lat, request.dest_lng = dest_coords
+
+def geometry_signature(geometry: List[List[float]]) -> Optional[Tuple]:
+    """
+    Cheap identity for a route polyline: length + start + middle + end coordinates.
+    A flat tuple of numbers hashes and compares without any string formatting.
+    """
+    if not geometry:
+        return None
+    start, mid, end = geometry[0], geometry[len(geometry)//2], geometry[-1]
+    return (len(geometry), start[0], start[1], mid[0], mid[1], end[0], end[1])
+
+def to_leaflet_geometry(geometry: List[List[float]]) -> List[List[float]]:
+    """
+    Convert GeoJSON [lng, lat] pairs to Leaflet [lat, lng].
+    Only called for routes that are actually returned to the client.
+    """
+    return [[p[1], p[0]] for p in geometry]
+
 @app.get("/")
 async def root():
     return FileResponse("frontend.html")
@@ -167,19 +233,22 @@ async def health_check():
         "endpoints": ["/calculate-route", "/alternative-routes", "/recalculate", "/health"]
     }
 
+# Same for every route; built once instead of per request
+STATIC_TIPS = (
+    "Maintain steady speed for optimal efficiency",
+    "Coast when approaching stops to save fuel",
+    "Check tire pressure before long trips"
+)
+
 @app.post("/calculate-route", response_model=RouteResponse)
 async def calculate_route(request: RouteRequest):
     """Calculate single optimal route"""
+    return await _calculate_route_impl(request)
+
+async def _calculate_route_impl(request: RouteRequest) -> RouteResponse:
+    """Shared body of /calculate-route and /recalculate"""
     # 1. Geocoding Fallback
-    if not request.origin_lat or not request.origin_lng:
-        coords = await GeocodingService.get_coordinates(request.origin)
-        if coords:
-            request.origin_lat, request.origin_lng = coords
-            
-    if not request.dest_lat or not request.dest_lng:
-        coords = await GeocodingService.get_coordinates(request.destination)
-        if coords:
-            request.dest_lat, request.dest_lng = coords
+    await geocode_missing_endpoints(request)
 
     if not (request.origin_lat and request.origin_lng and request.dest_lat and request.dest_lng):
         # Friendly error message for address resolution failures
@@ -189,8 +258,14 @@ async def calculate_route(request: RouteRequest):
         )
 
     try:
-        # Fetch Routes
-        routes_data = await RouteFinder.get_routes(request.origin_lat, request.origin_lng, request.dest_lat, request.dest_lng)
+        # Fetch Routes (origin weather doesn't depend on the route, fetch alongside)
+        # The response carries no polyline and uses only the primary route, so skip
+        # alternatives and ask for the simplified overview
+        routes_data, weather = await asyncio.gather(
+            RouteFinder.get_routes(request.origin_lat, request.origin_lng, request.dest_lat, request.dest_lng,
+                                   overview="simplified", alternatives=0),
+            WeatherService.get_weather(request.origin_lat, request.origin_lng)
+        )
         if not routes_data:
             raise HTTPException(status_code=404, detail="No routes found for the given locations.")
         
@@ -200,22 +275,17 @@ async def calculate_route(request: RouteRequest):
             request.origin, request.destination,
             request.origin_lat, request.origin_lng, 
             request.dest_lat, request.dest_lng,
-            request.fuel_efficiency
+            request.fuel_efficiency,
+            weather=weather
         )
         
-        tips = [
-            "Maintain steady speed for optimal efficiency",
-            "Coast when approaching stops to save fuel",
-            "Check tire pressure before long trips"
-        ]
-
         return RouteResponse(
             origin=request.origin,
             destination=request.destination,
             metrics=processed["metrics"],
             traffic_condition=processed["traffic"].value,
             waypoints=processed["waypoints"],
-            tips=tips
+            tips=STATIC_TIPS
         )
     except HTTPException:
         raise
@@ -223,25 +293,34 @@ async def calculate_route(request: RouteRequest):
         print(f"Routing Error: {e}")
         raise HTTPException(status_code=500, detail="An error occurred while calculating the route. Please try again.")
 
-async def fetch_osrm_route(coords: List[Tuple[float, float]]) -> List[dict]:
+# Via-point routes keyed on the rounded waypoint sequence
+_osrm_cache = TTLCache(maxsize=4096, ttl=21600)
+_osrm_flights = SingleFlight()
+
+# Fixed query for via-point routes (we force alts by vias), encoded once; overview is appended per call
+VIA_ROUTE_QUERY = "alternatives=false&steps=false&geometries=geojson"
+
+async def fetch_osrm_route(coords: List[Tuple[float, float]], overview: str = "full") -> List[dict]:
     """
     Fetch route from OSRM supporting multiple waypoints.
     coords: List of (lat, lng) tuples.
+    overview: "simplified" while comparing candidates, "full" for routes drawn on the map.
     """
+    cache_key = (tuple((round(lat, 4), round(lon, 4)) for lat, lon in coords), overview)
+    cached = _osrm_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    return await _osrm_flights.run(cache_key, lambda: _fetch_osrm_route(coords, overview, cache_key))
+
+async def _fetch_osrm_route(coords: List[Tuple[float, float]], overview: str, cache_key: tuple) -> List[dict]:
     # Convert to "lng,lat" strings joined by ";"
     coord_str = ";".join([f"{lon},{lat}" for lat, lon in coords])
     try:
-        url = f"https://router.project-osrm.org/route/v1/driving/{coord_str}"
-        params = {
-            "alternatives": "false", # We force alts by vias
-            "steps": "false",
-            "geometries": "geojson",
-            "overview": "full"
-        }
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, timeout=5)
-        data = response.json()
+        url = f"{OSRM_URL}/route/v1/driving/{coord_str}?{VIA_ROUTE_QUERY}&overview={overview}"
+        response = await upstream_get("osrm", url)
+        data = orjson.loads(response.content)
         if data.get("code") == "Ok" and "routes" in data:
+            _osrm_cache.set(cache_key, data["routes"])
             return data["routes"]
     except Exception as e:
         print(f"OSRM Fetch Error: {e}")
@@ -264,31 +343,23 @@ def get_deviation_point(olat, olng, dlat, dlng, offset_scale=0.05) -> Tuple[floa
     perp_lng = dx
     
     # Normalize (rough approximation)
-    mag = math.sqrt(perp_lat**2 + perp_lng**2)
+    mag = math.hypot(perp_lat, perp_lng)
     if mag == 0: return (mid_lat + offset_scale, mid_lng + offset_scale)
     
-    perp_lat /= mag
-    perp_lng /= mag
+    # Fold normalization and offset into one factor
+    scale = offset_scale / mag
     
     # Apply offset
-    dev_lat = mid_lat + (perp_lat * offset_scale)
-    dev_lng = mid_lng + (perp_lng * offset_scale)
+    dev_lat = mid_lat + (perp_lat * scale)
+    dev_lng = mid_lng + (perp_lng * scale)
     
     return (dev_lat, dev_lng)
 
-@app.post("/alternative-routes")
+@app.post("/alternative-routes", response_model=AlternativesResponse)
 async def get_alternative_routes(request: RouteRequest):
     """Get 3 PHYSICALLY DISTINCT routes: Efficient, Fastest, Balanced"""
     # 1. Geocoding Fallback
-    if not request.origin_lat or not request.origin_lng:
-        coords = await GeocodingService.get_coordinates(request.origin)
-        if coords:
-            request.origin_lat, request.origin_lng = coords
-            
-    if not request.dest_lat or not request.dest_lng:
-        coords = await GeocodingService.get_coordinates(request.destination)
-        if coords:
-            request.dest_lat, request.dest_lng = coords
+    await geocode_missing_endpoints(request)
 
     if not (request.origin_lat and request.origin_lng and request.dest_lat and request.dest_lng):
         raise HTTPException(
@@ -298,25 +369,35 @@ async def get_alternative_routes(request: RouteRequest):
 
     try:
         unique_routes = []
+        # (via point or None, index in that OSRM response, weight_name) per unique route,
+        # to refetch its full geometry
+        route_sources = []
         seen_geometries = set()
 
-        def add_route_if_new(r_data):
+        def add_route_if_new(r_data, via, index):
             # Create a rough hash of geometry to detect duplicates
             # Sampling every 5th point
             geo = r_data.get("geometry", {}).get("coordinates", [])
             if not geo: return
             
-            # Simple hash: start + end + length + middle
-            sig = f"{len(geo)}-{geo[0]}-{geo[-1]}-{geo[len(geo)//2]}"
+            sig = geometry_signature(geo)
             
             if sig not in seen_geometries:
                 seen_geometries.add(sig)
                 unique_routes.append(r_data)
-
-        # 1. Try Standard Alternatives
-        initial_routes = await RouteFinder.get_routes(request.origin_lat, request.origin_lng, request.dest_lat, request.dest_lng)
-        for r in initial_routes:
-            add_route_if_new(r)
+                route_sources.append((via, index, r_data.get("weight_name")))
+
+        # 1. Try Standard Alternatives (endpoint weather is independent, fetch alongside)
+        # Origin and destination weather come back from one multi-location request.
+        # Candidates are compared on simplified polylines; only the winners are refetched in full
+        initial_routes, (origin_weather, dest_weather) = await asyncio.gather(
+            RouteFinder.get_routes(request.origin_lat, request.origin_lng, request.dest_lat, request.dest_lng,
+                                   overview="simplified"),
+            WeatherService.get_weather_many([(request.origin_lat, request.origin_lng),
+                                             (request.dest_lat, request.dest_lng)])
+        )
+        for i, r in enumerate(initial_routes):
+            add_route_if_new(r, None, i)
 
         # 2. Force Diversity if needed (Via Points)
         # Strategy: Compute deviations to force left/right paths
@@ -324,139 +405,131 @@ async def get_alternative_routes(request: RouteRequest):
         dist_approx = math.sqrt((request.origin_lat - request.dest_lat)**2 + (request.origin_lng - request.dest_lng)**2)
         scale = max(0.02, dist_approx * 0.2) # Dynamic scale
 
-        if len(unique_routes) < 3:
-            # Deviation 1 (Left)
-            via1 = get_deviation_point(request.origin_lat, request.origin_lng, request.dest_lat, request.dest_lng, scale)
-            via1 = await RouteFinder.snap_to_road(via1[0], via1[1])
-            r_dev1 = await fetch_osrm_route([(request.origin_lat, request.origin_lng), via1, (request.dest_lat, request.dest_lng)])
-            for r in r_dev1: add_route_if_new(r)
+        def via_coords(via: Tuple[float, float]) -> List[Tuple[float, float]]:
+            return [(request.origin_lat, request.origin_lng), via, (request.dest_lat, request.dest_lng)]
+
+        async def fetch_deviation(offset: float) -> Tuple[Tuple[float, float], List[dict]]:
+            via = get_deviation_point(request.origin_lat, request.origin_lng, request.dest_lat, request.dest_lng, offset)
+            via = await RouteFinder.snap_to_road(via[0], via[1])
+            return via, await fetch_osrm_route(via_coords(via), overview="simplified")
+
+        async def full_geometry(candidate: dict) -> List[List[float]]:
+            via, index, weight_name = candidate["source"]
+            # A straight-line fallback has no OSRM route behind it; a refetch would either
+            # time out again or pair its metrics with an unrelated polyline
+            if weight_name == "fallback":
+                return candidate["geometry"]
+            if via is None:
+                routes = await RouteFinder.get_routes(request.origin_lat, request.origin_lng,
+                                                      request.dest_lat, request.dest_lng)
+            else:
+                routes = await fetch_osrm_route(via_coords(via))
+            # Keep the simplified polyline if the full fetch failed or fell back to a straight line
+            if index < len(routes) and routes[index].get("weight_name") != "fallback":
+                return routes[index].get("geometry", {}).get("coordinates") or candidate["geometry"]
+            return candidate["geometry"]
 
         if len(unique_routes) < 3:
-            # Deviation 2 (Right)
-            via2 = get_deviation_point(request.origin_lat, request.origin_lng, request.dest_lat, request.dest_lng, -scale)
-            via2 = await RouteFinder.snap_to_road(via2[0], via2[1])
-            r_dev2 = await fetch_osrm_route([(request.origin_lat, request.origin_lng), via2, (request.dest_lat, request.dest_lng)])
-            for r in r_dev2: add_route_if_new(r)
+            # Deviation 1 (Left) and 2 (Right) are fetched together; one may turn out
+            # redundant, but that beats a second serial snap + route round trip
+            (via1, r_dev1), (via2, r_dev2) = await asyncio.gather(fetch_deviation(scale), fetch_deviation(-scale))
+            for i, r in enumerate(r_dev1): add_route_if_new(r, via1, i)
+            if len(unique_routes) < 3:
+                for i, r in enumerate(r_dev2): add_route_if_new(r, via2, i)
 
         # 3. Process all found routes
-        processed_candidates = []
-        for r_data in unique_routes:
-            processed = await process_route_data(
+        # Elevation samples of every candidate go out in one batched lookup
+        elevation_stats = await ElevationService.get_routes_elevation_stats(
+            [r_data.get("geometry", {}).get("coordinates", []) for r_data in unique_routes]
+        )
+        # Every candidate shares the same endpoints
+        waypoints = [
+            {"lat": request.origin_lat, "lng": request.origin_lng, "name": request.origin},
+            {"lat": request.dest_lat, "lng": request.dest_lng, "name": request.destination}
+        ]
+        # Elevation and weather are already in hand, so processing a candidate awaits nothing
+        processed_candidates = [
+            await process_route_data(
                 r_data, request.origin, request.destination,
                 request.origin_lat, request.origin_lng,
                 request.dest_lat, request.dest_lng,
-                request.fuel_efficiency
+                request.fuel_efficiency,
+                weather=origin_weather,
+                elevation=elevation,
+                waypoints=waypoints
             )
-            processed_candidates.append(processed)
+            for r_data, elevation in zip(unique_routes, elevation_stats)
+        ]
+        for candidate, source in zip(processed_candidates, route_sources):
+            candidate["source"] = source
 
         # 4. Strictly Assign Roles based on Data
         if not processed_candidates:
             raise HTTPException(status_code=404, detail="No unique routes found")
 
         # Find absolute bests regardless of previous sorting
-        candidates_by_time = sorted(processed_candidates, key=lambda x: x["metrics"].estimated_time_min)
-        true_fastest = candidates_by_time[0]
+        true_fastest = min(processed_candidates, key=lambda x: x["metrics"].estimated_time_min)
+        true_efficient = min(processed_candidates, key=lambda x: x["metrics"].co2_kg)
         
-        candidates_by_co2 = sorted(processed_candidates, key=lambda x: x["metrics"].co2_kg)
-        true_efficient = candidates_by_co2[0]
-        
-        final_selection = []
-
         # Check for Overlap (Same Geometry check)
-        # Using the first point + length + middle point as a proxy for identity
-        def get_geo_sig(r):
-            g = r["geometry"]
-            if not g: return "empty"
-            return f"{len(g)}-{g[0]}-{g[-1]}"
+        fastest_sig = geometry_signature(true_fastest["geometry"])
+        efficient_sig = geometry_signature(true_efficient["geometry"])
 
-        is_same_route = get_geo_sig(true_fastest) == get_geo_sig(true_efficient)
+        is_same_route = fastest_sig == efficient_sig
 
         if is_same_route:
-            # CASE: The Efficient route IS the Fastest route
-            combined_metrics = true_fastest["metrics"]
-            
-            final_selection.append(AlternativeRoute(
-                route_name="Fastest & Most Efficient",
-                route_type="most_efficient", # Green color priority
-                metrics=combined_metrics,
-                waypoints=true_fastest["waypoints"],
-                geometry=true_fastest["geometry"],
-                weather_summary=true_fastest["weather_summary"],
-                traffic_summary=f"{true_fastest['traffic'].value.title()} Traffic"
-            ))
-            
+            # CASE: The Efficient route IS the Fastest route (green color priority)
+            picks = [("Fastest & Most Efficient", "most_efficient", true_fastest)]
         else:
-            # CASE: Distinct routes exist
-            
-            # 1. Most Efficient
-            final_selection.append(AlternativeRoute(
-                route_name="Most Efficient",
-                route_type="most_efficient",
-                metrics=true_efficient["metrics"],
-                waypoints=true_efficient["waypoints"],
-                geometry=true_efficient["geometry"],
-                weather_summary=true_efficient["weather_summary"],
-                traffic_summary=f"{true_efficient['traffic'].value.title()} Traffic"
-            ))
-
-            # 2. Fastest Route
-            final_selection.append(AlternativeRoute(
-                route_name="Fastest Route",
-                route_type="fastest",
-                metrics=true_fastest["metrics"],
-                waypoints=true_fastest["waypoints"],
-                geometry=true_fastest["geometry"],
-                weather_summary=true_fastest["weather_summary"],
-                traffic_summary=f"{true_fastest['traffic'].value.title()} Traffic"
-            ))
-
-            # 3. Balanced Option
-            remaining = [c for c in processed_candidates if get_geo_sig(c) != get_geo_sig(true_efficient) and get_geo_sig(c) != get_geo_sig(true_fastest)]
+            # CASE: Distinct routes exist: 1. Most Efficient, 2. Fastest Route, 3. Balanced Option
+            picks = [
+                ("Most Efficient", "most_efficient", true_efficient),
+                ("Fastest Route", "fastest", true_fastest)
+            ]
+            remaining = [c for c in processed_candidates if geometry_signature(c["geometry"]) not in (efficient_sig, fastest_sig)]
             
             if remaining:
-                remaining.sort(key=lambda x: x["metrics"].total_cost_score)
-                balanced = remaining[0]
-                
-                final_selection.append(AlternativeRoute(
-                    route_name="Balanced Option",
-                    route_type="balanced",
-                    metrics=balanced["metrics"],
-                    waypoints=balanced["waypoints"],
-                    geometry=balanced["geometry"],
-                    weather_summary=balanced["weather_summary"],
-                    traffic_summary=f"{balanced['traffic'].value.title()} Traffic"
-                ))
-
-        # Rounding for display
-        for alt in final_selection:
-            alt.metrics.co2_kg = round(alt.metrics.co2_kg, 3)
-            alt.metrics.fuel_liters = round(alt.metrics.fuel_liters, 3)
-            alt.metrics.cost_usd = round(alt.metrics.cost_usd, 3)
-
-        # Weather
-        origin_weather = await WeatherService.get_weather(request.origin_lat, request.origin_lng)
-        dest_weather = await WeatherService.get_weather(request.dest_lat, request.dest_lng)
-
-        return {
-            "alternatives": [alt.model_dump() for alt in final_selection],
-            "origin_weather": origin_weather.model_dump() if origin_weather else None,
-            "destination_weather": dest_weather.model_dump() if dest_weather else None,
-            "current_time": datetime.now().isoformat()
-        }
+                balanced = min(remaining, key=lambda x: x["metrics"].total_cost_score)
+                picks.append(("Balanced Option", "balanced", balanced))
+
+        # Only the 1-3 winners are drawn, so only their full polylines are fetched (together)
+        geometries = await asyncio.gather(*(full_geometry(c) for _, _, c in picks))
+
+        # Fields below come from our own validated RouteMetrics/OSRM data, so the
+        # AlternativeRoute models are built with model_construct (no re-validation)
+        final_selection = [
+            AlternativeRoute.model_construct(
+                route_name=route_name,
+                route_type=route_type,
+                metrics=c["metrics"],
+                waypoints=c["waypoints"],
+                geometry=to_leaflet_geometry(geometry),
+                weather_summary=c["weather_summary"],
+                traffic_summary=c["traffic_summary"]
+            )
+            for (route_name, route_type, c), geometry in zip(picks, geometries)
+        ]
+
+        return AlternativesResponse(
+            alternatives=final_selection,
+            origin_weather=origin_weather,
+            destination_weather=dest_weather,
+            current_time=datetime.now().isoformat()
+        )
     except HTTPException:
         raise
     except Exception as e:
         print(f"Alternatives Error: {e}")
         raise HTTPException(status_code=500, detail="An error occurred while finding alternative routes.")
 
-@app.post("/recalculate")
+@app.post("/recalculate", response_model=RecalculateResponse)
 async def recalculate_route(request: RouteRequest):
     """Dynamic Recalculation"""
-    # Just reuse calculate logic
-    return {
-        "message": "Recalculated",
-        "route": await calculate_route(request)
-    }
+    # Just reuse calculate logic (the plain helper, not the other endpoint)
+    return RecalculateResponse(
+        message="Recalculated",
+        route=await _calculate_route_impl(request)
+    )
 
 class TTSRequest(BaseModel):
     text: str
@@ -467,29 +540,46 @@ class TTSRequest(BaseModel):
             raise ValueError('Text length must be under 500 characters')
         return v
 
+# Synthesized clips keyed on text; navigation prompts repeat a lot
+_tts_cache = TTLCache(maxsize=128, ttl=86400)
+
 @app.post("/tts")
 async def text_to_speech(request: TTSRequest):
     """
     Convert text to speech using Microsoft Edge TTS (Free, High Quality)
     """
+    cached = _tts_cache.get(request.text)
+    if cached is not None:
+        return Response(content=cached, media_type="audio/mpeg")
+
     try:
         voice = "en-US-AriaNeural" 
         communicate = edge_tts.Communicate(request.text, voice)
-        
-        # Use TemporaryDirectory for automatic cleanup
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tmp_path = os.path.join(tmp_dir, "speech.mp3")
-            await communicate.save(tmp_path)
-            
-            with open(tmp_path, "rb") as f:
-                audio_data = f.read()
-                
-            return Response(content=audio_data, media_type="audio/mpeg")
+        audio_chunks = (chunk["data"] async for chunk in communicate.stream() if chunk["type"] == "audio")
+
+        # Wait for the first chunk so synthesis failures still surface as a 500,
+        # then stream the rest to the client as Edge produces it
+        first_chunk = await audio_chunks.__anext__()
 
     except Exception as e:
         print(f"TTS Error: {e}")
         raise HTTPException(status_code=500, detail=f"TTS Error: {str(e)}")
 
+    async def stream_audio():
+        audio_data = bytearray(first_chunk)
+        yield first_chunk
+        async for chunk in audio_chunks:
+            audio_data.extend(chunk)
+            yield chunk
+        # Only complete clips are cached
+        _tts_cache.set(request.text, bytes(audio_data))
+
+    return StreamingResponse(stream_audio(), media_type="audio/mpeg")
+
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvicorn[standard] brings uvloop + httptools, picked automatically when installed.
+    # Each worker is its own process with its own HTTP client and caches.
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers, log_level="warning")
\ No newline at end of file
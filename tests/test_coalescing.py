@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+
+import orjson
+
+import core
+
+CURRENT = {"current": {"temperature_2m": 25, "precipitation": 0, "wind_speed_10m": 3, "weathercode": 1}}
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self.content = orjson.dumps(data)
+        self.headers = {}
+
+
+class CountingClient:
+    """Stands in for the shared AsyncClient; counts upstream GETs and answers slowly"""
+
+    is_closed = False
+
+    def __init__(self):
+        self.urls = []
+
+    async def get(self, url, **kwargs):
+        self.urls.append(url)
+        await asyncio.sleep(0.05)
+        if "open-meteo" in url:
+            n = url.split("latitude=")[1].split("&")[0].count(",") + 1
+            return FakeResponse([CURRENT] * n if n > 1 else CURRENT)
+        if "/nearest/" in url:
+            return FakeResponse({"code": "Ok", "waypoints": [{"location": [78.45, 17.35]}]})
+        raise AssertionError(f"unexpected upstream call: {url}")
+
+    async def aclose(self):
+        pass
+
+
+class CoalescingTest(unittest.TestCase):
+    def setUp(self):
+        self.client = CountingClient()
+        self._get_http_client = core.get_http_client
+        core.get_http_client = lambda: self.client
+        core._upstream_semaphores.clear()
+        core.WeatherService._cache = core.TTLCache(maxsize=16, ttl=600)
+        core.WeatherService._validators = core.TTLCache(maxsize=16, ttl=3600)
+        core.RouteFinder._snap_cache = core.TTLCache(maxsize=16, ttl=3600)
+
+    def tearDown(self):
+        core.get_http_client = self._get_http_client
+        core._upstream_semaphores.clear()
+
+    def test_single_flight_runs_fetch_once(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 7
+
+        async def run():
+            flights = core.SingleFlight()
+            results = await asyncio.gather(*(flights.run("key", fetch) for _ in range(10)))
+            return results, flights._inflight
+
+        results, inflight = asyncio.run(run())
+        self.assertEqual(results, [7] * 10)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(inflight, {})
+
+    def test_concurrent_weather_batches_share_one_request(self):
+        points = [(17.3, 78.4), (17.36, 78.46)]
+
+        async def run():
+            return await asyncio.gather(*(core.WeatherService.get_weather_many(points) for _ in range(5)))
+
+        results = asyncio.run(run())
+        self.assertEqual(len(self.client.urls), 1)
+        for readings in results:
+            self.assertEqual([w.temperature for w in readings], [25, 25])
+            self.assertFalse(any(w.is_fallback for w in readings))
+        # Every caller gets its own copy
+        self.assertIsNot(results[0][0], results[1][0])
+
+    def test_snap_to_road_is_cached_and_coalesced(self):
+        async def run():
+            first = await asyncio.gather(*(core.RouteFinder.snap_to_road(17.351, 78.452) for _ in range(5)))
+            again = await core.RouteFinder.snap_to_road(17.351, 78.452)
+            return first, again
+
+        first, again = asyncio.run(run())
+        self.assertEqual(len(self.client.urls), 1)
+        self.assertEqual(set(first), {(17.35, 78.45)})
+        self.assertEqual(again, (17.35, 78.45))
+
+
+if __name__ == "__main__":
+    unittest.main()